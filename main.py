@@ -4,8 +4,9 @@ Main application file for the regular inspection (정기 점검) management weba
 This application uses a very small WSGI‑based framework built from Python's
 standard library. It does not rely on external web frameworks such as
 Flask because those packages are not available in this environment. Instead
-we implement our own URL dispatching and form parsing using the built‑in
-``wsgiref`` and ``cgi`` modules. HTML templates are rendered with Jinja2.
+we implement our own URL dispatching on top of the built‑in ``wsgiref``
+module and parse forms with the small ``multipart`` package. HTML templates
+are rendered with Jinja2.
 
 Key features of the webapp:
 
@@ -36,18 +37,30 @@ To run this app locally on your machine you can start it via the
 
 Then open ``http://localhost:8000`` in your browser. When packaging
 into Docker the provided Dockerfile will install the dependencies
-(``jinja2``) and run the server on port 8000.
+(``jinja2`` and ``multipart``) and run the server on port 8000.
 """
 
-import cgi
+import atexit
+import itertools
+import json
+import mimetypes
 import os
+import re
+import shutil
 import sqlite3
+import threading
+import time
 import urllib.parse
+from collections import defaultdict
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
-
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path, PurePosixPath
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple
+
+import multipart
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
 from wsgiref.simple_server import make_server
 from wsgiref.util import FileWrapper
 
@@ -56,31 +69,169 @@ from wsgiref.util import FileWrapper
 BASE_DIR = Path(__file__).resolve().parent
 DB_PATH = BASE_DIR / "database.db"
 ATTACHMENTS_DIR = BASE_DIR / "attachments"
-
-# Ensure attachments directory exists
+TEMPLATE_CACHE_DIR = BASE_DIR / ".jinja_cache"
+# Task columns selected for display and editing (everything except created_at)
+TASK_COLUMNS = (
+    "t.id, t.company_id, t.task_type, t.signature_method, t.schedule_type, t.schedule_detail, "
+    "t.contact_name, t.contact_phone, t.contact_email, t.detail_name, t.active"
+)
+# Keys of the checklist item dicts returned by get_items_with_completion*,
+# matching the column order of their SELECTs
+ITEM_KEYS = ('id', 'task_id', 'description', 'attachment', 'order_num', 'completed')
+# Seconds a cached get_tasks_for_month() result stays valid
+MONTH_TASKS_CACHE_TTL = 30.0
+# Schema version stored in PRAGMA user_version; bump when init_db gains a migration
+SCHEMA_VERSION = 4
+# Due months of a task scheduled every month
+ALL_MONTHS: FrozenSet[int] = frozenset(range(1, 13))
+# Maximum number of fields accepted in one multipart form (the edit form sends
+# several fields per checklist item)
+MAX_FORM_PARTS = 2000
+# Buffer size used when copying uploaded files to disk (well above the 8 KiB
+# io default, so large uploads take few read/write syscalls)
+UPLOAD_CHUNK_SIZE = 1 << 20
+# Block size for attachment downloads when the server can't use sendfile
+DOWNLOAD_BLOCK_SIZE = 1 << 20
+
+# Ensure attachments and template bytecode cache directories exist
 ATTACHMENTS_DIR.mkdir(exist_ok=True)
+TEMPLATE_CACHE_DIR.mkdir(exist_ok=True)
 
 # Jinja2 environment for rendering templates
 env = Environment(
     loader=FileSystemLoader(str(BASE_DIR / "templates")),
     autoescape=select_autoescape(["html", "xml"]),
+    # Templates only change on redeploy; skip the per-render mtime check
+    auto_reload=False,
+    cache_size=-1,
+    # Persist compiled template bytecode so restarts skip parsing/compiling
+    bytecode_cache=FileSystemBytecodeCache(str(TEMPLATE_CACHE_DIR)),
 )
 
+# Per-thread SQLite connection shared by all helpers (see get_db_connection)
+_db_local = threading.local()
+
+# Serialises opening connections so only one thread creates a fresh database
+_db_init_lock = threading.Lock()
+
+# Cached result of get_companies(); None means not loaded yet
+_companies_cache: Optional[List[sqlite3.Row]] = None
+
+# Cached get_tasks_for_month() results: month -> (time.monotonic() when loaded, rows)
+_month_tasks_cache: Dict[int, Tuple[float, List[sqlite3.Row]]] = {}
+
+# Sequence number mixed into attachment file names (see make_attachment_name)
+_attachment_seq = itertools.count()
+
+# URL quoting for strings that repeat across requests (email subjects, recipients)
+_QUOTE = lru_cache(maxsize=1024)(urllib.parse.quote)
+
+
+@lru_cache(maxsize=None)
+def get_template(template_name: str) -> Template:
+    """Return the compiled template, loading it on first use only."""
+    return env.get_template(template_name)
+
+
+def preload_templates() -> None:
+    """
+    Load and compile every template up front so the first request that uses
+    each one does not pay the parse/compile cost.
+    """
+    for template_name in env.list_templates():
+        get_template(template_name)
+
+
+preload_templates()
+
 
 def render_template(template_name: str, context: Dict[str, Any]) -> bytes:
     """Render a Jinja2 template and return it as UTF‑8 encoded bytes."""
-    template = env.get_template(template_name)
+    template = get_template(template_name)
     html = template.render(context)
     return html.encode("utf-8")
 
 
+@lru_cache(maxsize=256)
+def _render_cached(template_name: str, context_items: Tuple[Tuple[str, Any], ...]) -> Tuple[bytes, str]:
+    body = render_template(template_name, dict(context_items))
+    # Content-Length header value is stored with the body so it's computed once
+    return body, str(len(body))
+
+
+def render_template_cached_with_length(template_name: str, context: Dict[str, Any]) -> Tuple[bytes, str]:
+    """
+    Like render_template, but memoize the output for contexts whose values are
+    all hashable (e.g. 404 pages with a fixed message). Only use this for
+    templates that are a pure function of their context. Falls back to an
+    uncached render when the context holds lists, rows or other unhashables.
+    Returns (body, content_length) ready for the response headers.
+    """
+    context_items = tuple(sorted(context.items()))
+    try:
+        hash(context_items)
+    except TypeError:
+        body = render_template(template_name, context)
+        return body, str(len(body))
+    return _render_cached(template_name, context_items)
+
+
+def render_template_cached(template_name: str, context: Dict[str, Any]) -> bytes:
+    """Cached render returning only the body; see render_template_cached_with_length."""
+    return render_template_cached_with_length(template_name, context)[0]
+
+
 def get_db_connection() -> sqlite3.Connection:
-    """Return a new SQLite connection with row factory set to Row."""
-    conn = sqlite3.connect(DB_PATH)
+    """
+    Return the SQLite connection for the current thread, opening it lazily.
+
+    The connection is reused by every helper during a request (and across
+    requests on the same thread), so callers must not close it. Transactions
+    are finished by :func:`db_transaction_middleware` at the end of each
+    request. If the database file doesn't exist yet it is created and
+    initialised with :func:`init_db` before the connection is returned.
+    """
+    conn = getattr(_db_local, 'conn', None)
+    if conn is None:
+        with _db_init_lock:
+            return _open_db_connection()
+    return conn
+
+
+def _open_db_connection() -> sqlite3.Connection:
+    """Open and tune this thread's connection; caller holds _db_init_lock."""
+    # Check before connecting, since connecting creates the file
+    needs_init = not DB_PATH.exists()
+    # Keep every hot statement prepared for the lifetime of the connection
+    # (the sqlite3 module's default cache holds 128).
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    # Per-connection tuning (journal_mode is persistent and set in init_db).
+    # With WAL, synchronous=NORMAL only syncs at checkpoints.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-40000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA foreign_keys=ON")
+    # Store the connection first so init_db's get_db_connection() reuses it
+    _db_local.conn = conn
+    if needs_init:
+        init_db()
     return conn
 
 
+def close_db_connection() -> None:
+    """Close the current thread's connection, if one is open."""
+    conn = getattr(_db_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _db_local.conn = None
+
+
+# Close the main thread's connection cleanly on interpreter shutdown
+atexit.register(close_db_connection)
+
+
 def init_db() -> None:
     """
     Initialize the SQLite database with required tables if they don't exist.
@@ -89,9 +240,16 @@ def init_db() -> None:
     - companies: stores customer (회사) and sub‑customer (상세고객사) information.
     - tasks: stores task definitions including scheduling and metadata.
     - checklist_items: stores individual checklist steps for each task.
+    - checklist_completions: per year/month completion status of each item.
+    - task_months: the months (1-12) in which each task is due, derived from
+      its schedule settings.
+    - attachments: the client's original file name for each stored upload.
     """
     conn = get_db_connection()
     cur = conn.cursor()
+    # Write-ahead logging lets readers run alongside a writer and halves the
+    # fsyncs per commit. The setting is stored in the database file itself.
+    cur.execute("PRAGMA journal_mode=WAL")
     # Create companies table
     cur.execute(
         """
@@ -119,6 +277,8 @@ def init_db() -> None:
             detail_name TEXT,
             -- 활성화 여부; 1이면 대시보드 및 월별 통계에 표시, 0이면 숨김 처리됨
             active INTEGER NOT NULL DEFAULT 1,
+            -- completed=1 인 checklist_completions 개수; 트리거로 자동 갱신됨
+            completed_count INTEGER NOT NULL DEFAULT 0,
             created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (company_id) REFERENCES companies(id)
         )
@@ -153,8 +313,35 @@ def init_db() -> None:
         )
         """
     )
+
+    # Create task_months table (due months per task, kept in sync on task save)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS task_months (
+            task_id INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            PRIMARY KEY (task_id, month),
+            FOREIGN KEY (task_id) REFERENCES tasks(id)
+        )
+        """
+    )
+
+    # Create attachments table (stored file name -> original upload name)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS attachments (
+            unique_name TEXT PRIMARY KEY,
+            original_name TEXT NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
     conn.commit()
 
+    # Skip the migrations below once the database is on the current schema
+    cur.execute("PRAGMA user_version")
+    if cur.fetchone()[0] >= SCHEMA_VERSION:
+        return
+
     # If the tasks table exists but lacks the detail_name column (for existing DBs), add it dynamically.
     # This allows seamless upgrades without requiring manual migration.
     cur.execute("PRAGMA table_info(tasks)")
@@ -166,22 +353,131 @@ def init_db() -> None:
     if "active" not in columns:
         cur.execute("ALTER TABLE tasks ADD COLUMN active INTEGER NOT NULL DEFAULT 1")
         conn.commit()
-    conn.close()
+    # Add completed_count column if missing and fill it from existing completions
+    if "completed_count" not in columns:
+        cur.execute("ALTER TABLE tasks ADD COLUMN completed_count INTEGER NOT NULL DEFAULT 0")
+        cur.execute(
+            """
+            UPDATE tasks SET completed_count = (
+                SELECT COUNT(*)
+                FROM checklist_completions cc
+                JOIN checklist_items ci ON cc.item_id = ci.id
+                WHERE ci.task_id = tasks.id AND cc.completed = 1
+            )
+            """
+        )
+        conn.commit()
+
+    # Keep tasks.completed_count in sync with checklist_completions
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_cc_ai AFTER INSERT ON checklist_completions
+        WHEN NEW.completed = 1
+        BEGIN
+            UPDATE tasks SET completed_count = completed_count + 1
+            WHERE id = (SELECT task_id FROM checklist_items WHERE id = NEW.item_id);
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_cc_au AFTER UPDATE OF completed ON checklist_completions
+        WHEN NEW.completed != OLD.completed
+        BEGIN
+            UPDATE tasks SET completed_count = completed_count + (NEW.completed = 1) - (OLD.completed = 1)
+            WHERE id = (SELECT task_id FROM checklist_items WHERE id = NEW.item_id);
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_cc_ad AFTER DELETE ON checklist_completions
+        WHEN OLD.completed = 1
+        BEGIN
+            UPDATE tasks SET completed_count = completed_count - 1
+            WHERE id = (SELECT task_id FROM checklist_items WHERE id = OLD.item_id);
+        END
+        """
+    )
+    conn.commit()
 
+    # Indexes for the hot lookups (created after the migrations above so that
+    # the active column is guaranteed to exist).
+    # - checklist items per task, in display order
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_ci_task ON checklist_items(task_id, order_num)")
+    # - per-month completion status; includes completed so lookups are index-only
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_cc_item_ym ON checklist_completions(item_id, year, month, completed)"
+    )
+    # - tasks due in a given month
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_task_months_month ON task_months(month, task_id)")
+    # - visible tasks, optionally filtered by company
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tasks_company_active ON tasks(active, company_id)")
+    conn.commit()
+
+    # Populate task_months for tasks created before the table existed
+    cur.execute(
+        """
+        SELECT id, schedule_type, schedule_detail FROM tasks
+        WHERE id NOT IN (SELECT task_id FROM task_months)
+        """
+    )
+    for row in cur.fetchall():
+        sync_task_months(cur, row['id'], row['schedule_type'], row['schedule_detail'])
+    # Record original names for attachments uploaded before the attachments
+    # table existed; those names are encoded as <prefix>_<prefix>_<original>.
+    cur.execute(
+        """
+        SELECT attachment FROM checklist_items
+        WHERE attachment IS NOT NULL
+          AND attachment NOT IN (SELECT unique_name FROM attachments)
+        """
+    )
+    legacy = []
+    for (unique_name,) in cur.fetchall():
+        parts = unique_name.split('_', 2)
+        legacy.append((unique_name, parts[2] if len(parts) > 2 else unique_name))
+    cur.executemany(
+        "INSERT OR IGNORE INTO attachments (unique_name, original_name) VALUES (?, ?)",
+        legacy,
+    )
+    cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+    cur.execute("PRAGMA optimize")
 
-def parse_month_list(month_list_str: Optional[str]) -> List[int]:
+
+@lru_cache(maxsize=2048)
+def parse_month_list(month_list_str: Optional[str]) -> FrozenSet[int]:
     """
-    Convert a comma‑separated string of month numbers into a list of ints.
+    Convert a comma‑separated string of month numbers into a set of ints.
 
-    Returns an empty list if month_list_str is None or empty.
+    Returns an empty set if month_list_str is None or empty. Results are
+    cached per string, so the returned set is shared and immutable.
     """
     if not month_list_str:
-        return []
+        return frozenset()
     try:
         months = [int(m) for m in month_list_str.split(',') if m.strip()]
-        return [m for m in months if 1 <= m <= 12]
+        return frozenset(m for m in months if 1 <= m <= 12)
     except ValueError:
-        return []
+        return frozenset()
+
+
+def get_task_due_months(schedule_type: Optional[str], schedule_detail: Optional[str]) -> FrozenSet[int]:
+    """Return the months (1-12) in which a task with the given schedule is due."""
+    if schedule_type == 'monthly':
+        return ALL_MONTHS
+    return parse_month_list(schedule_detail)
+
+
+def sync_task_months(cur: sqlite3.Cursor, task_id: int, schedule_type: Optional[str],
+                     schedule_detail: Optional[str]) -> None:
+    """Rewrite the task_months rows of a task from its schedule settings."""
+    cur.execute("DELETE FROM task_months WHERE task_id = ?", (task_id,))
+    cur.executemany(
+        "INSERT OR IGNORE INTO task_months (task_id, month) VALUES (?, ?)",
+        [(task_id, m) for m in sorted(get_task_due_months(schedule_type, schedule_detail))],
+    )
 
 
 def get_tasks_for_month(month: int) -> List[sqlite3.Row]:
@@ -193,30 +489,41 @@ def get_tasks_for_month(month: int) -> List[sqlite3.Row]:
     - schedule_type == 'quarterly' or 'custom', and the month appears in
       schedule_detail as a comma‑separated list of months (e.g., '1,4,7,10')
 
-    Returns a list of rows from the tasks table joined with companies.
+    The due months are precomputed into the task_months table whenever a task
+    is saved (see sync_task_months), so the filtering happens in SQL.
+
+    Returns a list of rows from the tasks table joined with companies. Results
+    are cached per month for MONTH_TASKS_CACHE_TTL seconds and dropped by
+    invalidate_month_tasks_cache() whenever a handler writes to tasks; callers
+    must not mutate the returned list.
     """
+    now = time.monotonic()
+    cached = _month_tasks_cache.get(month)
+    if cached is not None and now - cached[0] < MONTH_TASKS_CACHE_TTL:
+        return cached[1]
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-        SELECT t.*, c.name AS company_name, c.sub_name AS company_sub_name
-        FROM tasks t
+        f"""
+        SELECT {TASK_COLUMNS}, c.name AS company_name, c.sub_name AS company_sub_name
+        FROM task_months tm
+        JOIN tasks t ON tm.task_id = t.id
         JOIN companies c ON t.company_id = c.id
-        WHERE t.active = 1
-        """
+        WHERE tm.month = ? AND t.active = 1
+        ORDER BY t.id
+        """,
+        (month,),
     )
-    tasks: List[sqlite3.Row] = []
-    for row in cur.fetchall():
-        if row['schedule_type'] == 'monthly':
-            due_months = list(range(1, 13))
-        else:
-            due_months = parse_month_list(row['schedule_detail'])
-        if month in due_months:
-            tasks.append(row)
-    conn.close()
+    tasks = cur.fetchall()
+    _month_tasks_cache[month] = (now, tasks)
     return tasks
 
 
+def invalidate_month_tasks_cache() -> None:
+    """Drop all cached get_tasks_for_month results; call after writes to tasks."""
+    _month_tasks_cache.clear()
+
+
 def count_incomplete_items(task_id: int) -> int:
     """Count how many checklist items for the given task are incomplete."""
     conn = get_db_connection()
@@ -226,7 +533,6 @@ def count_incomplete_items(task_id: int) -> int:
         (task_id,),
     )
     count: int = cur.fetchone()[0]
-    conn.close()
     return count
 
 
@@ -234,48 +540,43 @@ def has_any_completion(task_id: int) -> bool:
     """
     Return True if the given task has any completed checklist item in any year/month.
     A task is considered executed if at least one checklist_completions row exists
-    for any of its items with completed=1.
+    for any of its items with completed=1 (tracked in tasks.completed_count).
     """
     conn = get_db_connection()
     cur = conn.cursor()
+    cur.execute("SELECT completed_count FROM tasks WHERE id = ?", (task_id,))
+    row = cur.fetchone()
+    return row is not None and row['completed_count'] > 0
+
+
+def bulk_ensure_completions(cur: sqlite3.Cursor, task_id: int, year: int, month: int) -> None:
+    """
+    Insert a completed=0 record for every checklist item of the task that has
+    no completion record for the given year/month yet, in a single statement.
+    """
     cur.execute(
         """
-        SELECT COUNT(*)
-        FROM checklist_completions cc
-        JOIN checklist_items ci ON cc.item_id = ci.id
-        WHERE ci.task_id = ? AND cc.completed = 1
+        INSERT OR IGNORE INTO checklist_completions (item_id, year, month, completed)
+        SELECT id, ?, ?, 0 FROM checklist_items WHERE task_id = ?
         """,
-        (task_id,),
+        (year, month, task_id),
     )
-    count = cur.fetchone()[0]
-    conn.close()
-    return count > 0
 
 
-def ensure_completion(item_id: int, year: int, month: int) -> int:
+def bulk_ensure_completions_for_tasks(cur: sqlite3.Cursor, task_ids: List[int], year: int, month: int) -> None:
     """
-    Ensure a completion record exists for the given item/year/month. If no
-    record exists, insert one with completed=0. Returns the current
-    completion status (0 or 1).
+    Like bulk_ensure_completions, but for the items of several tasks at once.
+    The task ids are bound as one JSON array so a single prepared statement
+    serves any number of tasks.
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT completed FROM checklist_completions WHERE item_id = ? AND year = ? AND month = ?",
-        (item_id, year, month),
-    )
-    row = cur.fetchone()
-    if row is not None:
-        conn.close()
-        return int(row['completed'])
-    # Insert default 0
     cur.execute(
-        "INSERT INTO checklist_completions (item_id, year, month, completed) VALUES (?, ?, ?, 0)",
-        (item_id, year, month),
+        """
+        INSERT OR IGNORE INTO checklist_completions (item_id, year, month, completed)
+        SELECT ci.id, ?, ?, 0 FROM checklist_items ci
+        WHERE ci.task_id IN (SELECT value FROM json_each(?))
+        """,
+        (year, month, json.dumps(task_ids)),
     )
-    conn.commit()
-    conn.close()
-    return 0
 
 
 def get_incomplete_count_year_month(task_id: int, year: int, month: int) -> int:
@@ -286,18 +587,19 @@ def get_incomplete_count_year_month(task_id: int, year: int, month: int) -> int:
     """
     conn = get_db_connection()
     cur = conn.cursor()
+    bulk_ensure_completions(cur, task_id, year, month)
+    conn.commit()
     cur.execute(
-        "SELECT id FROM checklist_items WHERE task_id = ?",
-        (task_id,),
+        """
+        SELECT COUNT(*)
+        FROM checklist_items ci
+        LEFT JOIN checklist_completions cc
+               ON cc.item_id = ci.id AND cc.year = ? AND cc.month = ?
+        WHERE ci.task_id = ? AND COALESCE(cc.completed, 0) = 0
+        """,
+        (year, month, task_id),
     )
-    items = [row['id'] for row in cur.fetchall()]
-    conn.close()
-    incomplete = 0
-    for item_id in items:
-        status = ensure_completion(item_id, year, month)
-        if status == 0:
-            incomplete += 1
-    return incomplete
+    return int(cur.fetchone()[0])
 
 
 def get_items_with_completion(task_id: int, year: int, month: int) -> List[Dict[str, Any]]:
@@ -308,17 +610,59 @@ def get_items_with_completion(task_id: int, year: int, month: int) -> List[Dict[
     """
     conn = get_db_connection()
     cur = conn.cursor()
+    bulk_ensure_completions(cur, task_id, year, month)
+    conn.commit()
+    # List the item columns explicitly: checklist_items has its own legacy
+    # ``completed`` column that must not shadow the per-month status.
+    # Rows are fetched as plain tuples and zipped with ITEM_KEYS, which is
+    # cheaper than building dicts from sqlite3.Row objects.
+    cur.row_factory = None
     cur.execute(
-        "SELECT * FROM checklist_items WHERE task_id = ? ORDER BY order_num",
-        (task_id,),
+        """
+        SELECT ci.id, ci.task_id, ci.description, ci.attachment, ci.order_num,
+               COALESCE(cc.completed, 0) AS completed
+        FROM checklist_items ci
+        LEFT JOIN checklist_completions cc
+               ON cc.item_id = ci.id AND cc.year = ? AND cc.month = ?
+        WHERE ci.task_id = ?
+        ORDER BY ci.order_num
+        """,
+        (year, month, task_id),
+    )
+    return [dict(zip(ITEM_KEYS, row)) for row in cur.fetchall()]
+
+
+def get_items_with_completion_for_tasks(task_ids: List[int], year: int,
+                                        month: int) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Batch version of get_items_with_completion: fetch the checklist items of
+    all given tasks with their year/month completion status in one query.
+
+    Returns a mapping from task id to its items (in order_num order). Tasks
+    without items are absent from the mapping. Items without a completion
+    record are reported as incomplete.
+    """
+    if not task_ids:
+        return {}
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(
+        """
+        SELECT ci.id, ci.task_id, ci.description, ci.attachment, ci.order_num,
+               COALESCE(cc.completed, 0) AS completed
+        FROM checklist_items ci
+        LEFT JOIN checklist_completions cc
+               ON cc.item_id = ci.id AND cc.year = ? AND cc.month = ?
+        WHERE ci.task_id IN (SELECT value FROM json_each(?))
+        ORDER BY ci.task_id, ci.order_num
+        """,
+        (year, month, json.dumps(task_ids)),
     )
-    items = cur.fetchall()
-    conn.close()
-    result: List[Dict[str, Any]] = []
-    for item in items:
-        status = ensure_completion(item['id'], year, month)
-        result.append({**dict(item), 'completed': status})
-    return result
+    return {
+        task_id: [dict(zip(ITEM_KEYS, row)) for row in rows]
+        for task_id, rows in groupby(cur.fetchall(), key=itemgetter(1))
+    }
 
 
 def parse_form_data(environ) -> Tuple[Dict[str, List[str]], Dict[str, List[Any]]]:
@@ -326,8 +670,13 @@ def parse_form_data(environ) -> Tuple[Dict[str, List[str]], Dict[str, List[Any]]
     Parse POST form data (both urlencoded and multipart) and return a tuple of
     (form_fields, file_fields).
 
-    This parser extends the basic cgi.FieldStorage handling to better align
-    uploaded files with their associated checklist descriptions. When multiple
+    Multipart bodies are parsed with the ``multipart`` package, which streams
+    the request and spools large uploads to temporary files instead of
+    buffering the whole body in memory. Parts are handled one by one in the
+    order they appear in the POST body.
+
+    Uploaded files need to be aligned with their associated checklist
+    descriptions. When multiple
     checklist items are provided via dynamic form fields (e.g. multiple
     ``item_description`` and ``item_file`` fields), browsers only send file
     inputs for rows where a file was actually selected. Without special
@@ -339,56 +688,159 @@ def parse_form_data(environ) -> Tuple[Dict[str, List[str]], Dict[str, List[Any]]
     Returns:
         form_fields: mapping from field name to list of string values.
         file_fields: mapping from field name to list of tuples. For checklist
-            files (``item_file``) each tuple is of the form (row_index, FieldStorage).
-            Other file inputs are stored with just the FieldStorage.
+            files (``item_file``) each tuple is of the form (row_index, MultipartPart).
+            Other file inputs are stored with just the MultipartPart.
     """
-    form_fields: Dict[str, List[str]] = {}
-    file_fields: Dict[str, List[Any]] = {}
+    form_fields: Dict[str, List[str]] = defaultdict(list)
+    file_fields: Dict[str, List[Any]] = defaultdict(list)
+    content_type, options = multipart.parse_options_header(environ.get('CONTENT_TYPE', ''))
     try:
-        fs = cgi.FieldStorage(fp=environ['wsgi.input'], environ=environ, keep_blank_values=True)
-    except Exception:
-        # If parsing fails, return empty structures
-        return form_fields, file_fields
-    if not fs:
+        content_length = int(environ.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    if content_length <= 0:
         return form_fields, file_fields
+    stream = environ['wsgi.input']
 
-    # Track index for checklist descriptions to pair with file inputs
-    current_item_index = -1
+    try:
+        if content_type != 'multipart/form-data':
+            # URL-encoded body (the default for forms without an enctype)
+            body = stream.read(content_length).decode('utf-8')
+            for name, value in urllib.parse.parse_qsl(body, keep_blank_values=True):
+                form_fields[name].append(value)
+            return form_fields, file_fields
+
+        parser = multipart.MultipartParser(
+            stream,
+            options.get('boundary', ''),
+            content_length,
+            charset='utf-8',
+            part_limit=MAX_FORM_PARTS,
+        )
+        # Track index for checklist descriptions to pair with file inputs
+        current_item_index = -1
 
-    if hasattr(fs, 'list') and fs.list:
-        for field in fs.list:
+        for field in parser:
             # Checklist description increments the current index
             if field.name == 'item_description':
                 current_item_index += 1
-                value = field.value if isinstance(field.value, str) else field.value.decode('utf-8')
-                form_fields.setdefault('item_description', []).append(value)
+                form_fields['item_description'].append(field.value)
                 continue
 
             # File inputs: treat ``item_file`` specially to preserve row index
             if field.filename:
                 if field.name == 'item_file':
-                    file_fields.setdefault('item_file', []).append((current_item_index, field))
+                    file_fields['item_file'].append((current_item_index, field))
                 else:
-                    file_fields.setdefault(field.name, []).append(field)
+                    file_fields[field.name].append(field)
                 continue
 
             # All other text inputs (including hidden inputs and selects)
-            value = field.value if isinstance(field.value, str) else field.value.decode('utf-8')
-            form_fields.setdefault(field.name, []).append(value)
+            form_fields[field.name].append(field.value)
+    except Exception:
+        # If parsing fails, return empty structures
+        return {}, {}
 
     return form_fields, file_fields
 
 
+def attachment_original_name(filename: str) -> str:
+    """
+    Return the client-supplied upload name with any directory components
+    dropped, so it cannot escape ATTACHMENTS_DIR.
+    """
+    original_name = PurePosixPath(filename).name
+    if original_name in ('', '.', '..'):
+        original_name = 'file'
+    return original_name
+
+
+def make_attachment_name(filename: str) -> str:
+    """
+    Build a unique file name for an uploaded attachment in the form
+    ``<time_ns>_<sequence>_<original name>``. The per-process sequence keeps
+    names distinct even when two uploads land on the same clock tick.
+    """
+    return f"{time.time_ns()}_{next(_attachment_seq)}_{attachment_original_name(filename)}"
+
+
+def store_attachment(cur: sqlite3.Cursor, file_field: Any) -> str:
+    """
+    Save an uploaded file under a new unique name and record its original
+    name in the attachments table. Returns the unique name.
+    """
+    unique_name = make_attachment_name(file_field.filename)
+    save_uploaded_file(file_field, ATTACHMENTS_DIR / unique_name)
+    cur.execute(
+        "INSERT OR REPLACE INTO attachments (unique_name, original_name) VALUES (?, ?)",
+        (unique_name, attachment_original_name(file_field.filename)),
+    )
+    return unique_name
+
+
+def save_uploaded_file(file_field: Any, save_path: Path) -> None:
+    """
+    Write an uploaded file (a multipart.MultipartPart) to save_path, streaming it in
+    fixed-size chunks so the whole upload is never held in memory at once.
+
+    Parts larger than the parser's memory limit are spooled to a temporary file;
+    those are copied with os.sendfile so the data stays in the kernel. Small
+    in-memory parts, and platforms where sendfile can't target a regular file,
+    fall back to shutil.copyfileobj.
+    """
+    src = file_field.file
+    with open(save_path, 'wb', buffering=UPLOAD_CHUNK_SIZE) as f:
+        if not file_field.is_buffered() and hasattr(os, 'sendfile'):
+            try:
+                src_fd = src.fileno()
+                size = os.fstat(src_fd).st_size
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(f.fileno(), src_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                return
+            except OSError:
+                # e.g. sendfile to a regular file unsupported: restart with a plain copy
+                f.seek(0)
+                f.truncate()
+        src.seek(0)
+        shutil.copyfileobj(src, f, length=UPLOAD_CHUNK_SIZE)
+
+
 def get_companies() -> List[sqlite3.Row]:
-    """Retrieve all companies from the database sorted by name."""
+    """
+    Retrieve all companies from the database sorted by name.
+
+    The result is cached in memory until a company is added (see
+    invalidate_companies_cache).
+    """
+    global _companies_cache
+    if _companies_cache is not None:
+        return _companies_cache
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute("SELECT id, name, sub_name FROM companies ORDER BY name")
     companies = cur.fetchall()
-    conn.close()
+    _companies_cache = companies
     return companies
 
 
+def invalidate_companies_cache() -> None:
+    """Drop the cached company list; call after any write to companies."""
+    global _companies_cache
+    _companies_cache = None
+
+
+def company_exists(company_id: Optional[int]) -> bool:
+    """
+    Return True if a company with this id exists. Checked before writing a
+    task, since tasks.company_id is enforced as a foreign key.
+    """
+    return company_id is not None and any(c['id'] == company_id for c in get_companies())
+
+
 def get_all_tasks() -> List[sqlite3.Row]:
     """
     Retrieve all tasks joined with company names. Additionally include a
@@ -396,26 +848,21 @@ def get_all_tasks() -> List[sqlite3.Row]:
     (with completed=1) exist for the task across all years/months.
 
     The completed_count can be used by the caller to determine whether
-    the task has ever been executed.
+    the task has ever been executed. It is a column of the tasks table kept
+    up to date by triggers on checklist_completions (see init_db).
     """
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-        SELECT t.*, c.name AS company_name, c.sub_name AS company_sub_name,
-               (
-                   SELECT COUNT(*)
-                   FROM checklist_completions cc
-                   JOIN checklist_items ci ON cc.item_id = ci.id
-                   WHERE ci.task_id = t.id AND cc.completed = 1
-               ) AS completed_count
+        f"""
+        SELECT {TASK_COLUMNS}, t.completed_count,
+               c.name AS company_name, c.sub_name AS company_sub_name
         FROM tasks t
         JOIN companies c ON t.company_id = c.id
         ORDER BY c.name, t.id
         """
     )
     tasks = cur.fetchall()
-    conn.close()
     return tasks
 
 
@@ -457,10 +904,20 @@ def dashboard_handler(environ) -> Tuple[bytes, str]:
     if company_id is not None:
         tasks = [t for t in tasks if t['company_id'] == company_id]
 
+    task_ids = [t['id'] for t in tasks]
+    # 이 달의 완료 레코드가 없는 항목들에 대해 한 번에 기본값(0) 레코드 생성
+    if task_ids:
+        conn = get_db_connection()
+        bulk_ensure_completions_for_tasks(conn.cursor(), task_ids, selected_year, selected_month)
+        conn.commit()
+
+    # 모든 task의 체크리스트 항목/완료 상태를 한 번의 쿼리로 가져온다
+    items_by_task = get_items_with_completion_for_tasks(task_ids, selected_year, selected_month)
+
     annotated_tasks: List[Dict[str, Any]] = []
     for t in tasks:
-        incomplete = get_incomplete_count_year_month(t['id'], selected_year, selected_month)
-        items_with_status = get_items_with_completion(t['id'], selected_year, selected_month)
+        items_with_status = items_by_task.get(t['id'], [])
+        incomplete = sum(1 for item in items_with_status if not item['completed'])
         annotated_tasks.append({
             **dict(t),
             'incomplete_count': incomplete,
@@ -499,27 +956,56 @@ def build_month_stats(year: int, company_id: Optional[int] = None) -> Dict[int,
     각 월별로 (완료된 점검 개수, 전체 점검 개수)를 계산해서
     {1: (done, total), 2: (done, total), ... 12: (...)} 형태로 반환.
     """
-    stats: Dict[int, Tuple[int, int]] = {}
-
-    for month in range(1, 13):
-        # 이 달에 예정된 모든 task 가져오기
-        tasks = get_tasks_for_month(month)
+    # 한 번의 쿼리로 task별 전체 항목 수와 월별 완료 항목 수를 함께 가져온다.
+    # (월 × task × 항목마다 커넥션/쿼리를 반복하던 방식 대체)
+    sql = """
+        SELECT t.id, t.schedule_type, t.schedule_detail,
+               (SELECT COUNT(*) FROM checklist_items ci WHERE ci.task_id = t.id) AS total_items,
+               done.month AS month, done.completed_items AS completed_items
+        FROM tasks t
+        JOIN companies c ON t.company_id = c.id
+        LEFT JOIN (
+            SELECT ci.task_id, cc.month, COUNT(*) AS completed_items
+            FROM checklist_completions cc
+            JOIN checklist_items ci ON cc.item_id = ci.id
+            WHERE cc.year = ? AND cc.completed = 1
+            GROUP BY ci.task_id, cc.month
+        ) done ON done.task_id = t.id
+        WHERE t.active = 1
+    """
+    params: List[Any] = [year]
+    # 회사 필터가 있으면 필터 적용
+    if company_id is not None:
+        sql += " AND t.company_id = ?"
+        params.append(company_id)
 
-        # 회사 필터가 있으면 필터 적용
-        if company_id is not None:
-            tasks = [t for t in tasks if t['company_id'] == company_id]
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+
+    # task_id -> (예정된 월 목록, 전체 항목 수, {월: 완료 항목 수})
+    task_info: Dict[int, Tuple[FrozenSet[int], int, Dict[int, int]]] = {}
+    for row in rows:
+        info = task_info.get(row['id'])
+        if info is None:
+            due_months = get_task_due_months(row['schedule_type'], row['schedule_detail'])
+            info = (due_months, row['total_items'], {})
+            task_info[row['id']] = info
+        if row['month'] is not None:
+            info[2][row['month']] = row['completed_items']
 
-        total_tasks = len(tasks)
+    stats: Dict[int, Tuple[int, int]] = {}
+    for month in range(1, 13):
+        total_tasks = 0
         done_tasks = 0
-
-        for t in tasks:
-            # 이 task의 해당 연도/월 미완료 항목 개수
-            incomplete = get_incomplete_count_year_month(t['id'], year, month)
+        for due_months, total_items, completed_by_month in task_info.values():
+            if month not in due_months:
+                continue
+            total_tasks += 1
             # 체크리스트 항목이 하나도 없는 경우는 완전 완료로 보지 않도록
-            items = get_items_with_completion(t['id'], year, month)
-            if total_tasks > 0 and len(items) > 0 and incomplete == 0:
+            if total_items > 0 and completed_by_month.get(month, 0) >= total_items:
                 done_tasks += 1
-
         stats[month] = (done_tasks, total_tasks)
 
     return stats
@@ -527,7 +1013,7 @@ def build_month_stats(year: int, company_id: Optional[int] = None) -> Dict[int,
 
 def new_company_get_handler(environ) -> Tuple[bytes, str]:
     """Render the new company form."""
-    body = render_template("new_company.html", {})
+    body = render_template_cached("new_company.html", {})
     return body, 'text/html'
 
 
@@ -545,13 +1031,12 @@ def new_company_post_handler(environ) -> Tuple[bytes, str, str]:
     sub_name = sub_name_list[0].strip() if sub_name_list else None
     if name:
         conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO companies (name, sub_name) VALUES (?, ?)",
-            (name, sub_name if sub_name else None),
-        )
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute(
+                "INSERT INTO companies (name, sub_name) VALUES (?, ?)",
+                (name, sub_name if sub_name else None),
+            )
+        invalidate_companies_cache()
     # Redirect to dashboard
     return b'', 'text/plain', '/'
 
@@ -563,14 +1048,22 @@ def new_task_get_handler(environ) -> Tuple[bytes, str]:
     return body, 'text/html'
 
 
-def new_task_post_handler(environ) -> Tuple[bytes, str, str]:
+def new_task_post_handler(environ) -> Tuple:
     """
     Handle creation of a new task and its checklist items.
-    Returns (body, content_type, redirect_url).
+    Returns (body, content_type, redirect_url), or (body, content_type) with
+    a not-found page if the selected company doesn't exist.
     """
     form_fields, file_fields = parse_form_data(environ)
     # Retrieve scalar fields
-    company_id = int(form_fields.get('company_id', ['0'])[0])
+    try:
+        company_id: Optional[int] = int(form_fields.get('company_id', [''])[0])
+    except ValueError:
+        company_id = None
+    # A missing or stale company id would violate the tasks.company_id foreign key
+    if not company_exists(company_id):
+        body = render_template_cached("404.html", {'message': '해당 회사를 찾을 수 없습니다.'})
+        return body, 'text/html'
     task_type = form_fields.get('task_type', ['INHOUSE'])[0]
     signature_method = form_fields.get('signature_method', ['EMAIL'])[0]
     schedule_type = form_fields.get('schedule_type', ['monthly'])[0]
@@ -606,11 +1099,14 @@ def new_task_post_handler(environ) -> Tuple[bytes, str, str]:
         ),
     )
     task_id = cur.lastrowid
+    sync_task_months(cur, task_id, schedule_type, schedule_detail)
     # Retrieve list fields; we expect multiple descriptions
     descriptions = form_fields.get('item_description', [])
     # Build a mapping from row index to uploaded file for checklist items
-    file_entries = file_fields.get('item_file', [])  # list of (row_index, FieldStorage)
+    file_entries = file_fields.get('item_file', [])  # list of (row_index, MultipartPart)
     file_map: Dict[int, Any] = {idx: fs for idx, fs in file_entries}
+    # Save attachments first, then insert all checklist rows in one batch
+    item_rows: List[Tuple[int, str, Optional[str], int]] = []
     for idx, desc in enumerate(descriptions):
         desc_str = desc.strip()
         if not desc_str:
@@ -618,25 +1114,19 @@ def new_task_post_handler(environ) -> Tuple[bytes, str, str]:
         attachment_path = None
         # Determine if a file was uploaded for this row index
         file_field = file_map.get(idx)
-        # cgi.FieldStorage cannot be evaluated directly in boolean context; check for None explicitly
+        # Check for None explicitly rather than relying on the part's truthiness
         if file_field is not None and getattr(file_field, 'filename', None):
-            # Build unique filename based on timestamp, index and original name
-            unique_name = f"{int(datetime.now().timestamp())}_{idx}_{file_field.filename}"
-            save_path = ATTACHMENTS_DIR / unique_name
-            # Save file
-            with open(save_path, 'wb') as f:
-                data = file_field.file.read()
-                f.write(data)
-            attachment_path = unique_name
-        cur.execute(
-            """
-            INSERT INTO checklist_items (task_id, description, attachment, order_num)
-            VALUES (?, ?, ?, ?)
-            """,
-            (task_id, desc_str, attachment_path, idx),
-        )
+            attachment_path = store_attachment(cur, file_field)
+        item_rows.append((task_id, desc_str, attachment_path, idx))
+    cur.executemany(
+        """
+        INSERT INTO checklist_items (task_id, description, attachment, order_num)
+        VALUES (?, ?, ?, ?)
+        """,
+        item_rows,
+    )
     conn.commit()
-    conn.close()
+    invalidate_month_tasks_cache()
     # Redirect to dashboard
     return b'', 'text/plain', '/'
 
@@ -650,27 +1140,23 @@ def edit_task_get_handler(environ, task_id: int) -> Tuple[bytes, str]:
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-        SELECT t.*, c.name AS company_name, c.sub_name AS company_sub_name
+        f"""
+        SELECT {TASK_COLUMNS}, c.name AS company_name, c.sub_name AS company_sub_name
         FROM tasks t JOIN companies c ON t.company_id = c.id
         WHERE t.id = ?
         """,
         (task_id,),
     )
     task = cur.fetchone()
-    conn.close()
     if not task:
-        body = render_template("404.html", {'message': 'Task not found.'})
+        body = render_template_cached("404.html", {'message': 'Task not found.'})
         return body, 'text/html'
     # Fetch existing checklist items for this task
-    conn2 = get_db_connection()
-    cur2 = conn2.cursor()
-    cur2.execute(
-        "SELECT * FROM checklist_items WHERE task_id = ? ORDER BY order_num",
+    cur.execute(
+        "SELECT id, task_id, description, attachment, order_num FROM checklist_items WHERE task_id = ? ORDER BY order_num",
         (task_id,),
     )
-    items = [dict(row) for row in cur2.fetchall()]
-    conn2.close()
+    items = [dict(row) for row in cur.fetchall()]
     # Provide context for the form; include items for editing
     body = render_template(
         "edit_task.html",
@@ -700,6 +1186,9 @@ def edit_task_post_handler(environ, task_id: int) -> Tuple[bytes, str, str]:
             company_id = int(company_list[0])
         except ValueError:
             company_id = None
+    # Unknown companies are ignored like malformed ids (keeps the foreign key valid)
+    if not company_exists(company_id):
+        company_id = None
     task_type = form_fields.get('task_type', [None])[0]
     signature_method = form_fields.get('signature_method', [None])[0]
     schedule_type = form_fields.get('schedule_type', [None])[0]
@@ -712,12 +1201,22 @@ def edit_task_post_handler(environ, task_id: int) -> Tuple[bytes, str, str]:
     conn = get_db_connection()
     cur = conn.cursor()
     # Fetch existing task to know current values and company
-    cur.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
+    cur.execute(
+        """
+        SELECT company_id, task_type, signature_method, schedule_type, schedule_detail,
+               contact_name, contact_phone, contact_email, detail_name
+        FROM tasks WHERE id = ?
+        """,
+        (task_id,),
+    )
     existing = cur.fetchone()
     if not existing:
-        conn.close()
         return b'', 'text/plain', '/'
 
+    # Take the write lock up front so every change below (task, items,
+    # ordering) lands in one transaction with a single commit
+    cur.execute("BEGIN IMMEDIATE")
+
     # Update the task record; only set fields that are not None to allow partial updates
     update_values = {
         'company_id': company_id if company_id is not None else existing['company_id'],
@@ -751,6 +1250,7 @@ def edit_task_post_handler(environ, task_id: int) -> Tuple[bytes, str, str]:
             task_id,
         ),
     )
+    sync_task_months(cur, task_id, update_values['schedule_type'], update_values['schedule_detail'])
 
     # === Handle checklist items modifications ===
     # Fetch existing checklist items for this task
@@ -789,10 +1289,7 @@ def edit_task_post_handler(environ, task_id: int) -> Tuple[bytes, str, str]:
         if item_id in existing_file_map:
             fs = existing_file_map[item_id]
             if getattr(fs, 'filename', None):
-                unique_name = f"{int(datetime.now().timestamp())}_{item_id}_{fs.filename}"
-                save_path = ATTACHMENTS_DIR / unique_name
-                with open(save_path, 'wb') as f:
-                    f.write(fs.file.read())
+                new_attachment_path = store_attachment(cur, fs)
                 # Remove old attachment file if exists
                 old_path = row['attachment']
                 if old_path:
@@ -800,29 +1297,26 @@ def edit_task_post_handler(environ, task_id: int) -> Tuple[bytes, str, str]:
                         (ATTACHMENTS_DIR / old_path).unlink()
                     except Exception:
                         pass
-                new_attachment_path = unique_name
+                    cur.execute("DELETE FROM attachments WHERE unique_name = ?", (old_path,))
         # Append to update list
         items_to_update.append((item_id, new_desc, new_attachment_path))
 
-    # Delete items marked for deletion
-    for del_id in ids_to_delete:
-        # delete completions
-        cur.execute("DELETE FROM checklist_completions WHERE item_id = ?", (del_id,))
-        # delete item
-        cur.execute("DELETE FROM checklist_items WHERE id = ?", (del_id,))
-
-    # Update items
-    for (item_id, new_desc, new_attachment_path) in items_to_update:
-        if new_attachment_path is not None:
-            cur.execute(
-                "UPDATE checklist_items SET description = ?, attachment = ? WHERE id = ?",
-                (new_desc, new_attachment_path, item_id),
-            )
-        else:
-            cur.execute(
-                "UPDATE checklist_items SET description = ? WHERE id = ?",
-                (new_desc, item_id),
-            )
+    # Delete items marked for deletion (completions first, then the items)
+    delete_params = [(del_id,) for del_id in ids_to_delete]
+    cur.executemany("DELETE FROM checklist_completions WHERE item_id = ?", delete_params)
+    cur.executemany("DELETE FROM checklist_items WHERE id = ?", delete_params)
+
+    # Update items, batched by whether a new attachment was uploaded
+    with_attach = [(d, p, i) for (i, d, p) in items_to_update if p is not None]
+    without_attach = [(d, i) for (i, d, p) in items_to_update if p is None]
+    cur.executemany(
+        "UPDATE checklist_items SET description = ?, attachment = ? WHERE id = ?",
+        with_attach,
+    )
+    cur.executemany(
+        "UPDATE checklist_items SET description = ? WHERE id = ?",
+        without_attach,
+    )
 
     # Handle new items
     new_descriptions: List[str] = form_fields.get('new_item_description', [])
@@ -831,6 +1325,8 @@ def edit_task_post_handler(environ, task_id: int) -> Tuple[bytes, str, str]:
     cur.execute("SELECT COALESCE(MAX(order_num), -1) FROM checklist_items WHERE task_id = ?", (task_id,))
     max_order = cur.fetchone()[0]
     next_order = max_order + 1
+    # Save attachments first, then insert all new checklist rows in one batch
+    new_rows: List[Tuple[int, str, Optional[str], int]] = []
     for idx, desc in enumerate(new_descriptions):
         desc_str = desc.strip()
         if not desc_str:
@@ -839,31 +1335,31 @@ def edit_task_post_handler(environ, task_id: int) -> Tuple[bytes, str, str]:
         if idx < len(new_files):
             fs = new_files[idx]
             if getattr(fs, 'filename', None):
-                unique_name = f"{int(datetime.now().timestamp())}_new_{idx}_{fs.filename}"
-                save_path = ATTACHMENTS_DIR / unique_name
-                with open(save_path, 'wb') as f:
-                    f.write(fs.file.read())
-                attach_path = unique_name
-        cur.execute(
-            "INSERT INTO checklist_items (task_id, description, attachment, order_num) VALUES (?, ?, ?, ?)",
-            (task_id, desc_str, attach_path, next_order),
-        )
+                attach_path = store_attachment(cur, fs)
+        new_rows.append((task_id, desc_str, attach_path, next_order))
         next_order += 1
+    cur.executemany(
+        "INSERT INTO checklist_items (task_id, description, attachment, order_num) VALUES (?, ?, ?, ?)",
+        new_rows,
+    )
 
     # Reorder the remaining items to have sequential order_num starting from 0
     cur.execute(
-        "SELECT id FROM checklist_items WHERE task_id = ? ORDER BY order_num",
+        """
+        WITH ord AS (
+            SELECT id, row_number() OVER (ORDER BY order_num, id) - 1 AS rn
+            FROM checklist_items WHERE task_id = ?
+        )
+        UPDATE checklist_items
+        SET order_num = ord.rn
+        FROM ord
+        WHERE ord.id = checklist_items.id
+        """,
         (task_id,),
     )
-    all_item_ids = [row['id'] for row in cur.fetchall()]
-    for new_order, iid in enumerate(all_item_ids):
-        cur.execute(
-            "UPDATE checklist_items SET order_num = ? WHERE id = ?",
-            (new_order, iid),
-        )
 
     conn.commit()
-    conn.close()
+    invalidate_month_tasks_cache()
     # After editing, redirect back to dashboard (current year and month not specified); you may choose to redirect to all tasks
     return b'', 'text/plain', '/'
 
@@ -875,18 +1371,19 @@ def delete_task_handler(environ, task_id: int) -> Tuple[bytes, str, str]:
     """
     conn = get_db_connection()
     cur = conn.cursor()
-    # Get item ids for this task
-    cur.execute("SELECT id FROM checklist_items WHERE task_id = ?", (task_id,))
-    item_ids = [row['id'] for row in cur.fetchall()]
-    # Delete completions for these items
-    for item_id in item_ids:
-        cur.execute("DELETE FROM checklist_completions WHERE item_id = ?", (item_id,))
+    cur.execute("BEGIN IMMEDIATE")
+    # Delete completions for this task's items
+    cur.execute(
+        "DELETE FROM checklist_completions WHERE item_id IN (SELECT id FROM checklist_items WHERE task_id = ?)",
+        (task_id,),
+    )
     # Delete checklist items
     cur.execute("DELETE FROM checklist_items WHERE task_id = ?", (task_id,))
-    # Delete task itself
+    # Delete due months and the task itself
+    cur.execute("DELETE FROM task_months WHERE task_id = ?", (task_id,))
     cur.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
     conn.commit()
-    conn.close()
+    invalidate_month_tasks_cache()
     # Redirect to the all tasks list
     return b'', 'text/plain', '/all'
 
@@ -920,46 +1417,46 @@ def compose_email_handler(environ) -> Tuple[bytes, str]:
     except ValueError:
         month = datetime.now().month
     if company_id is None:
-        body = render_template("404.html", {'message': '잘못된 회사 ID입니다.'})
+        body = render_template_cached("404.html", {'message': '잘못된 회사 ID입니다.'})
         return body, 'text/html'
     # Get company info
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute("SELECT name, sub_name FROM companies WHERE id = ?", (company_id,))
     comp = cur.fetchone()
-    conn.close()
     if not comp:
-        body = render_template("404.html", {'message': '해당 회사를 찾을 수 없습니다.'})
+        body = render_template_cached("404.html", {'message': '해당 회사를 찾을 수 없습니다.'})
         return body, 'text/html'
     company_name = comp['name']
     # Gather tasks for this company in the month
     tasks_in_month = [t for t in get_tasks_for_month(month) if t['company_id'] == company_id]
+    # Fetch items with completion status for this year/month for all tasks at once
+    items_by_task = get_items_with_completion_for_tasks([t['id'] for t in tasks_in_month], year, month)
     # Build email subject
     subject = f"{company_name} {year}년 {month}월 정기점검 결과"
-    body_lines: List[str] = []
     # Collect recipients from tasks
-    recipients = []
-    for t in tasks_in_month:
-        if t['contact_email']:
-            recipients.append(t['contact_email'])
-        # Header per sub-company/detail
+    recipients = [t['contact_email'] for t in tasks_in_month if t['contact_email']]
+
+    def _format_task(t) -> str:
+        # Header per sub-company/detail, followed by one line per checklist item
         detail = t['detail_name'] or t['company_sub_name'] or ''
-        header = f"- {detail} ({'사내점검' if t['task_type']=='INHOUSE' else '방문점검'})"
-        body_lines.append(header)
-        # Fetch items with completion status for this year/month
-        items = get_items_with_completion(t['id'], year, month)
-        for item in items:
-            status_mark = '✔' if item['completed'] else '✘'
-            line = f"    {status_mark} {item['description']}"
-            body_lines.append(line)
-        body_lines.append("")
-    # Compose body
-    body_text = f"{company_name} {year}년 {month}월 정기점검 체크리스트 결과입니다.\n\n" + "\n".join(body_lines)
+        lines = [f"- {detail} ({'사내점검' if t['task_type']=='INHOUSE' else '방문점검'})"]
+        lines += [
+            f"    {'✔' if item['completed'] else '✘'} {item['description']}"
+            for item in items_by_task.get(t['id'], [])
+        ]
+        return "\n".join(lines)
+
+    # Compose body (blocks separated by a blank line, trailing newline kept)
+    body_text = f"{company_name} {year}년 {month}월 정기점검 체크리스트 결과입니다.\n\n" + "\n\n".join(map(_format_task, tasks_in_month))
+    if tasks_in_month:
+        body_text += "\n"
     # Encode subject and body for mailto
-    import urllib.parse as up
-    to_param = up.quote(",".join(sorted(set([r for r in recipients if r]))))
-    subject_param = up.quote(subject)
-    body_param = up.quote(body_text)
+    unique_recipients = sorted(set(recipients))
+    to_param = _QUOTE(",".join(unique_recipients))
+    subject_param = _QUOTE(subject)
+    # The body changes with completion state, so it isn't worth caching
+    body_param = urllib.parse.quote(body_text)
     mailto_link = f"mailto:{to_param}?subject={subject_param}&body={body_param}" if to_param else f"mailto:?subject={subject_param}&body={body_param}"
     html_body = render_template(
         "email_compose.html",
@@ -970,7 +1467,7 @@ def compose_email_handler(environ) -> Tuple[bytes, str]:
             'subject': subject,
             'body_text': body_text,
             'mailto_link': mailto_link,
-            'recipients': sorted(set([r for r in recipients if r])),
+            'recipients': unique_recipients,
         },
     )
     return html_body, 'text/html'
@@ -995,8 +1492,8 @@ def task_detail_handler(environ, task_id: int) -> Tuple[bytes, str]:
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-        SELECT t.*, c.name AS company_name, c.sub_name AS company_sub_name
+        f"""
+        SELECT {TASK_COLUMNS}, c.name AS company_name, c.sub_name AS company_sub_name
         FROM tasks t JOIN companies c ON t.company_id = c.id
         WHERE t.id = ?
         """,
@@ -1004,11 +1501,10 @@ def task_detail_handler(environ, task_id: int) -> Tuple[bytes, str]:
     )
     task = cur.fetchone()
     if not task:
-        body = render_template("404.html", {'message': 'Task not found.'})
+        body = render_template_cached("404.html", {'message': 'Task not found.'})
         return body, 'text/html'
     # Retrieve items with completion status for this year/month
     items = get_items_with_completion(task_id, selected_year, selected_month)
-    conn.close()
     body = render_template(
         "view_task.html",
         {
@@ -1027,21 +1523,20 @@ def complete_item_handler(environ, task_id: int, item_id: int) -> Tuple[bytes, s
     Returns (body, content_type, redirect_url).
     """
     conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE checklist_items SET completed = 1 WHERE id = ? AND task_id = ?",
-        (item_id, task_id),
-    )
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute(
+            "UPDATE checklist_items SET completed = 1 WHERE id = ? AND task_id = ?",
+            (item_id, task_id),
+        )
     return b'', 'text/plain', f'/task/{task_id}'
 
 
-def toggle_item_handler(environ, task_id: int, item_id: int) -> Tuple[bytes, str, str]:
+def toggle_item_handler(environ, task_id: int, item_id: int) -> Tuple:
     """
     Toggle the completion status of a checklist item for a specific year and month.
     Expects POST form data containing 'year' and 'month' (and optional 'company', 'open_task').
-    Redirects back to the dashboard with the appropriate query parameters.
+    Redirects back to the dashboard with the appropriate query parameters, or
+    shows a not-found page if the item doesn't belong to the task.
     """
     form_fields, _ = parse_form_data(environ)
 
@@ -1055,32 +1550,39 @@ def toggle_item_handler(environ, task_id: int, item_id: int) -> Tuple[bytes, str
     except ValueError:
         month = datetime.now().month
 
-    # 현재 상태 → 토글
-    current_status = ensure_completion(item_id, year, month)
-    new_status = 0 if current_status == 1 else 1
-
     conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE checklist_completions SET completed = ? WHERE item_id = ? AND year = ? AND month = ?",
-        (new_status, item_id, year, month),
-    )
-    conn.commit()
-    conn.close()
+    # 해당 task 의 항목이 아니면 404 (checklist_completions.item_id 는 외래 키)
+    item = conn.execute(
+        "SELECT 1 FROM checklist_items WHERE id = ? AND task_id = ?", (item_id, task_id)
+    ).fetchone()
+    if item is None:
+        body = render_template_cached("404.html", {'message': '해당 항목을 찾을 수 없습니다.'})
+        return body, 'text/html'
+
+    # 현재 상태 → 토글 (레코드 생성과 갱신을 하나의 트랜잭션으로)
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO checklist_completions (item_id, year, month, completed) VALUES (?, ?, ?, 0)",
+            (item_id, year, month),
+        )
+        conn.execute(
+            "UPDATE checklist_completions SET completed = 1 - completed WHERE item_id = ? AND year = ? AND month = ?",
+            (item_id, year, month),
+        )
 
     # 리다이렉트 URL 만들기
-    query_params = [f"month={month}", f"year={year}"]
+    query_params: Dict[str, Any] = {'month': month, 'year': year}
 
     company = form_fields.get('company', [None])[0]
     if company:
-        query_params.append(f"company={company}")
+        query_params['company'] = company
 
     # 어떤 task를 펼쳐 둘지
     open_task = form_fields.get('open_task', [None])[0]
     if open_task:
-        query_params.append(f"open={open_task}")
+        query_params['open'] = open_task
 
-    redirect_url = '/' + ('?' + '&'.join(query_params) if query_params else '')
+    redirect_url = '/?' + urllib.parse.urlencode(query_params)
     return b'', 'text/plain', redirect_url
 
 
@@ -1104,14 +1606,13 @@ def update_tasks_visibility_handler(environ) -> Tuple[bytes, str, str]:
     action = form_fields.get('action', ['hide'])[0]
     if task_ids:
         conn = get_db_connection()
-        cur = conn.cursor()
-        placeholders = ','.join(['?'] * len(task_ids))
-        if action == 'show':
-            cur.execute(f"UPDATE tasks SET active = 1 WHERE id IN ({placeholders})", task_ids)
-        else:
-            cur.execute(f"UPDATE tasks SET active = 0 WHERE id IN ({placeholders})", task_ids)
-        conn.commit()
-        conn.close()
+        # 선택 개수와 무관하게 같은 문장을 재사용하도록 id 목록은 JSON 으로 바인딩
+        with conn:
+            conn.execute(
+                "UPDATE tasks SET active = ? WHERE id IN (SELECT value FROM json_each(?))",
+                (1 if action == 'show' else 0, json.dumps(task_ids)),
+            )
+        invalidate_month_tasks_cache()
     # Redirect to all tasks page
     return b'', 'text/plain', '/all'
 
@@ -1126,197 +1627,124 @@ def all_tasks_handler(environ) -> Tuple[bytes, str]:
     return body, 'text/html'
 
 
-def attachments_handler(environ, filename: str) -> Tuple[Iterable[bytes], str, int]:
+def attachments_handler(environ, filename: str) -> Tuple[Iterable[bytes], List[Tuple[str, str]], int]:
     """
-    Serve an uploaded attachment. Returns (body_iterable, content_type, status_code).
+    Serve an uploaded attachment. Returns (body_iterable, headers, status_code).
     If the file doesn't exist, returns a 404 page.
+
+    The file is handed to the server's ``wsgi.file_wrapper`` (falling back to
+    wsgiref's FileWrapper) so servers that support it can use sendfile(2)
+    instead of copying the file through Python.
     """
     file_path = ATTACHMENTS_DIR / filename
     if not file_path.exists() or not file_path.is_file():
-        body = render_template("404.html", {'message': 'File not found.'})
-        return [body], 'text/html', 404
-    # Determine original filename
-    parts = filename.split('_', 2)
-    original_name = parts[2] if len(parts) > 2 else filename
-    # Wrap file in iterator for streaming
-    def file_iter():
-        with open(file_path, 'rb') as f:
-            while True:
-                chunk = f.read(8192)
-                if not chunk:
-                    break
-                yield chunk
-    return file_iter(), original_name, 200
-
-
-def application(environ, start_response) -> Iterable[bytes]:
-    """
-    WSGI application entry point. Dispatches requests based on the path and
-    method and returns an iterable of bytes.
-    """
-    # Initialise DB if needed (only once per process)
-    if not DB_PATH.exists():
-        init_db()
+        body, content_length = render_template_cached_with_length("404.html", {'message': 'File not found.'})
+        headers = [
+            ('Content-Type', 'text/html; charset=utf-8'),
+            ('Cache-Control', 'no-cache'),
+            ('Content-Length', content_length),
+        ]
+        return [body], headers, 404
+    # Look up the original filename recorded at upload time
+    row = get_db_connection().execute(
+        "SELECT original_name FROM attachments WHERE unique_name = ?", (filename,)
+    ).fetchone()
+    original_name = row[0] if row is not None else filename
+    content_type = mimetypes.guess_type(original_name)[0] or 'application/octet-stream'
+    if original_name.isascii():
+        disposition = f'attachment; filename="{original_name}"'
+    else:
+        # Non-ASCII names can't go in a latin-1 header as-is (RFC 5987 form)
+        disposition = f"attachment; filename*=UTF-8''{urllib.parse.quote(original_name)}"
+    headers = [
+        ('Content-Type', content_type),
+        ('Content-Length', str(file_path.stat().st_size)),
+        ('Content-Disposition', disposition),
+    ]
+    file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+    return file_wrapper(open(file_path, 'rb'), DOWNLOAD_BLOCK_SIZE), headers, 200
+
+
+# URL routing table: (first path segment, compiled path pattern,
+# {method: handler}). The first segment is the literal text before the second
+# '/' ('' for '/') and is used to index the table. Captured groups are numeric
+# ids and are passed to the handler as ints. Handlers return (body,
+# content_type) for a 200 page or (body, content_type, redirect_url) for a
+# 303 redirect. Attachments are routed separately since they return a
+# streamed body with their own headers.
+Route = Tuple[Pattern[str], Dict[str, Callable[..., Tuple]]]
+ROUTES: List[Tuple[str, Pattern[str], Dict[str, Callable[..., Tuple]]]] = [
+    ('', re.compile(r'^/$'), {'GET': dashboard_handler}),
+    ('company', re.compile(r'^/company/new$'), {'GET': new_company_get_handler, 'POST': new_company_post_handler}),
+    ('task', re.compile(r'^/task/new$'), {'GET': new_task_get_handler, 'POST': new_task_post_handler}),
+    ('all', re.compile(r'^/all$'), {'GET': all_tasks_handler}),
+    ('tasks', re.compile(r'^/tasks/update$'), {'POST': update_tasks_visibility_handler}),
+    ('email', re.compile(r'^/email/compose$'), {'GET': compose_email_handler}),
+    ('task', re.compile(r'^/task/(\d+)/?$'), {'GET': task_detail_handler}),
+    ('task', re.compile(r'^/task/(\d+)/complete/(\d+)/?$'), {'POST': complete_item_handler}),
+    ('task', re.compile(r'^/task/(\d+)/toggle/(\d+)/?$'), {'POST': toggle_item_handler}),
+    ('task', re.compile(r'^/task/(\d+)/edit/?$'), {'GET': edit_task_get_handler, 'POST': edit_task_post_handler}),
+    ('task', re.compile(r'^/task/(\d+)/delete/?$'), {'POST': delete_task_handler}),
+]
+
+
+def build_route_index(routes: Iterable[Tuple[str, Pattern[str], Dict[str, Callable[..., Tuple]]]]) -> Dict[str, List[Route]]:
+    """Group routes by first path segment, keeping their declaration order."""
+    index: Dict[str, List[Route]] = defaultdict(list)
+    for segment, pattern, methods in routes:
+        index[segment].append((pattern, methods))
+    return dict(index)
+
+
+# Lets a request try only the few patterns that share its first segment
+ROUTE_INDEX: Dict[str, List[Route]] = build_route_index(ROUTES)
+
+
+def _invoke(handler: Callable[..., Tuple], environ, start_response, args: Iterable[int]) -> Iterable[bytes]:
+    """Call a routed handler and turn its result into a WSGI response."""
+    result = handler(environ, *args)
+    if len(result) == 3:
+        # (body, content_type, redirect_url)
+        start_response('303 See Other', [('Location', result[2])])
+        return [b'']
+    body, content_type = result
+    headers = [('Content-Type', content_type + '; charset=utf-8'), ('Content-Length', str(len(body)))]
+    start_response('200 OK', headers)
+    return [body]
+
+
+def dispatch_request(environ, start_response) -> Iterable[bytes]:
+    """
+    Dispatch a request based on the path and method and return an iterable
+    of bytes. Wrapped by :func:`db_transaction_middleware` to form the WSGI
+    ``application`` entry point.
+    """
     method = environ['REQUEST_METHOD']
     path = environ.get('PATH_INFO', '/')
     try:
         # Routing for static attachments
         if path.startswith('/attachments/') and method == 'GET':
             filename = path[len('/attachments/'):]
-            body_iter, orig_name, status_code = attachments_handler(environ, filename)
-            if status_code == 404:
-                status = '404 Not Found'
-                headers = [
-                    ('Content-Type', 'text/html; charset=utf-8'),
-                    ('Cache-Control', 'no-cache'),
-                ]
-                body = next(body_iter)
-                start_response(status, headers + [('Content-Length', str(len(body)))])
-                return [body]
-            # For file download
-            status = '200 OK'
-            headers = [
-                ('Content-Type', 'application/octet-stream'),
-                ('Content-Disposition', f'attachment; filename="{orig_name}"'),
-            ]
+            body_iter, headers, status_code = attachments_handler(environ, filename)
+            status = '404 Not Found' if status_code == 404 else '200 OK'
             start_response(status, headers)
             return body_iter
-        # Dashboard
-        if path == '/' and method == 'GET':
-            body, content_type = dashboard_handler(environ)
-            status = '200 OK'
-            headers = [('Content-Type', content_type + '; charset=utf-8'), ('Content-Length', str(len(body)))]
-            start_response(status, headers)
-            return [body]
-        # New company
-        if path == '/company/new':
-            if method == 'GET':
-                body, content_type = new_company_get_handler(environ)
-                status = '200 OK'
-                headers = [('Content-Type', content_type + '; charset=utf-8'), ('Content-Length', str(len(body)))]
-                start_response(status, headers)
-                return [body]
-            elif method == 'POST':
-                body, content_type, redirect_url = new_company_post_handler(environ)
-                status = '303 See Other'
-                headers = [('Location', redirect_url)]
-                start_response(status, headers)
-                return [b'']
-        # New task
-        if path == '/task/new':
-            if method == 'GET':
-                body, content_type = new_task_get_handler(environ)
-                status = '200 OK'
-                headers = [('Content-Type', content_type + '; charset=utf-8'), ('Content-Length', str(len(body)))]
-                start_response(status, headers)
-                return [body]
-            elif method == 'POST':
-                body, content_type, redirect_url = new_task_post_handler(environ)
-                status = '303 See Other'
-                headers = [('Location', redirect_url)]
-                start_response(status, headers)
-                return [b'']
-        # All tasks page
-        if path == '/all' and method == 'GET':
-            body, content_type = all_tasks_handler(environ)
-            status = '200 OK'
-            headers = [('Content-Type', content_type + '; charset=utf-8'), ('Content-Length', str(len(body)))]
-            start_response(status, headers)
-            return [body]
-        # Bulk hide tasks (from all tasks list)
-        if path == '/tasks/update' and method == 'POST':
-            body, content_type, redirect_url = update_tasks_visibility_handler(environ)
-            status = '303 See Other'
-            headers = [('Location', redirect_url)]
-            start_response(status, headers)
-            return [b'']
-        # Compose email page
-        if path == '/email/compose' and method == 'GET':
-            body, content_type = compose_email_handler(environ)
-            status = '200 OK'
-            headers = [('Content-Type', content_type + '; charset=utf-8'), ('Content-Length', str(len(body)))]
-            start_response(status, headers)
-            return [body]
-        # Task detail
-        # Match /task/<id>
-        if path.startswith('/task/'):
-            segments = path.strip('/').split('/')
-            if len(segments) == 2 and method == 'GET':
-                # /task/{task_id}
-                try:
-                    task_id = int(segments[1])
-                except ValueError:
-                    pass
-                else:
-                    body, content_type = task_detail_handler(environ, task_id)
-                    status = '200 OK' if content_type != 'text/html' or not body.startswith(b'<!DOCTYPE') else '200 OK'
-                    headers = [('Content-Type', content_type + '; charset=utf-8'), ('Content-Length', str(len(body)))]
-                    start_response(status, headers)
-                    return [body]
-            # /task/{task_id}/complete/{item_id} (POST)
-            if len(segments) == 4 and segments[2] == 'complete' and method == 'POST':
-                try:
-                    task_id = int(segments[1])
-                    item_id = int(segments[3])
-                except ValueError:
-                    pass
-                else:
-                    body, content_type, redirect_url = complete_item_handler(environ, task_id, item_id)
-                    status = '303 See Other'
-                    headers = [('Location', redirect_url)]
-                    start_response(status, headers)
-                    return [b'']
-            # /task/{task_id}/toggle/{item_id} (POST) - toggle per year/month
-            if len(segments) == 4 and segments[2] == 'toggle' and method == 'POST':
-                try:
-                    task_id = int(segments[1])
-                    item_id = int(segments[3])
-                except ValueError:
-                    pass
-                else:
-                    body, content_type, redirect_url = toggle_item_handler(environ, task_id, item_id)
-                    status = '303 See Other'
-                    headers = [('Location', redirect_url)]
-                    start_response(status, headers)
-                    return [b'']
-            # /task/{task_id}/edit (GET or POST)
-            if len(segments) == 3 and segments[2] == 'edit':
-                try:
-                    task_id = int(segments[1])
-                except ValueError:
-                    task_id = None
-                if task_id is not None:
-                    if method == 'GET':
-                        body, content_type = edit_task_get_handler(environ, task_id)
-                        status = '200 OK'
-                        headers = [('Content-Type', content_type + '; charset=utf-8'), ('Content-Length', str(len(body)))]
-                        start_response(status, headers)
-                        return [body]
-                    elif method == 'POST':
-                        body, content_type, redirect_url = edit_task_post_handler(environ, task_id)
-                        status = '303 See Other'
-                        headers = [('Location', redirect_url)]
-                        start_response(status, headers)
-                        return [b'']
-            # /task/{task_id}/delete (POST)
-            if len(segments) == 3 and segments[2] == 'delete' and method == 'POST':
-                try:
-                    task_id = int(segments[1])
-                except ValueError:
-                    task_id = None
-                if task_id is not None:
-                    body, content_type, redirect_url = delete_task_handler(environ, task_id)
-                    status = '303 See Other'
-                    headers = [('Location', redirect_url)]
-                    start_response(status, headers)
-                    return [b'']
+        for pattern, methods in ROUTE_INDEX.get(path[1:].split('/', 1)[0], ()):
+            match = pattern.match(path)
+            if match is None:
+                continue
+            handler = methods.get(method)
+            if handler is not None:
+                return _invoke(handler, environ, start_response, map(int, match.groups()))
         # Not Found
-        body = render_template("404.html", {'message': '페이지를 찾을 수 없습니다.'})
+        body, content_length = render_template_cached_with_length("404.html", {'message': '페이지를 찾을 수 없습니다.'})
         status = '404 Not Found'
-        headers = [('Content-Type', 'text/html; charset=utf-8'), ('Content-Length', str(len(body)))]
+        headers = [('Content-Type', 'text/html; charset=utf-8'), ('Content-Length', content_length)]
         start_response(status, headers)
         return [body]
     except Exception as exc:
+        # Discard any partial writes made by the failed handler
+        get_db_connection().rollback()
         # Internal server error
         error_body = render_template(
             "404.html",
@@ -1330,6 +1758,27 @@ def application(environ, start_response) -> Iterable[bytes]:
         return [error_body]
 
 
+def db_transaction_middleware(app: Callable) -> Callable:
+    """
+    WSGI middleware that finishes the shared connection's transaction at the
+    end of each request: commit on success, roll back if the app raised.
+    """
+    def wrapped(environ, start_response) -> Iterable[bytes]:
+        conn = get_db_connection()
+        try:
+            result = app(environ, start_response)
+        except Exception:
+            conn.rollback()
+            raise
+        if conn.in_transaction:
+            conn.commit()
+        return result
+    return wrapped
+
+
+application = db_transaction_middleware(dispatch_request)
+
+
 if __name__ == '__main__':
     # When run directly, start a simple development server.
     init_db()